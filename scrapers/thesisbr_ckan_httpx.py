@@ -59,13 +59,45 @@ import csv
 import time
 import json
 import math
+import random
 import shutil
 import typing as t
+import atexit
+import asyncio
+import hashlib
 import pathlib
 import argparse
 
 import httpx
 
+try:
+    # Optional: C-level JSON parser, 3-5x faster than stdlib on the
+    # multi-MB group_show/package_search payloads. Falls back cleanly.
+    import orjson
+
+    def _json_loads(data: bytes | str) -> t.Any:
+        return orjson.loads(data)
+
+    def _json_dumps(obj: t.Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    def _json_loads(data: bytes | str) -> t.Any:
+        return json.loads(data)
+
+    def _json_dumps(obj: t.Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+try:
+    # Optional: RFC 9111 cache (Cache-Control, stale-while-revalidate)
+    # mounted as a transport under the sync API client.
+    import hishel
+    if not hasattr(hishel, "CacheTransport"):
+        # hishel 1.x dropped the 0.x CacheTransport/FileStorage/Controller
+        # API used below; treat an incompatible version as absent.
+        hishel = None
+except ImportError:
+    hishel = None
+
 # =====================
 # Defaults / settings
 # =====================
@@ -76,11 +108,25 @@ DEFAULT_GROUP = os.getenv("CKAN_GROUP_ID", "catalogo-de-teses-e-dissertacoes-bra
 TIMEOUT_S = float(os.getenv("TIMEOUT", "120"))
 RETRY = int(os.getenv("RETRY", "3"))
 SLEEP_BETWEEN = float(os.getenv("SLEEP_BETWEEN", "2.0"))
+CONCURRENCY = int(os.getenv("CONCURRENCY", "8"))
+
+# Multi-part ranged download: only worth it above this size (bytes)
+MULTIPART_THRESHOLD = 32 * 1024 * 1024
+MULTIPART_PARTS = int(os.getenv("MULTIPART_PARTS", "4"))
+
+# Streaming chunk size: 4 MiB keeps the Python/C crossings per byte low
+CHUNK_SIZE = 4 * 1024 * 1024
+# Progress lines at most every 250 ms — printing per chunk dominates small files
+PROGRESS_INTERVAL_S = 0.25
+
+# On-disk cache for CKAN API responses (read-mostly metadata)
+CACHE_DIR = pathlib.Path(os.getenv("CKAN_CACHE_DIR", "~/.cache/thesisbr_ckan")).expanduser()
+CACHE_TTL_S = float(os.getenv("CACHE_TTL", str(24 * 3600)))
 
 # ===========================================
 # Small helpers to avoid urllib.parse usage
 # ===========================================
-_pct_pat = re.compile(r"%([0-9A-Fa-f]{2})")
+_pct_pat = re.compile(rb"%([0-9A-Fa-f]{2})")
 
 def pct_decode(s: str) -> str:
     """Minimal percent-decoder for filename tokens (RFC 3986-ish).
@@ -88,79 +134,190 @@ def pct_decode(s: str) -> str:
     """
     if not s or "%" not in s:
         return s
-    # Convert to bytes using a bytearray
-    out = bytearray()
-    i = 0
-    b = s.encode("utf-8", "ignore")  # raw bytes of string (best effort)
-    # We decode pattern on the string level to keep it simple:
-    # replace %HH by its byte value; otherwise keep the original byte.
-    while i < len(s):
-        ch = s[i]
-        if ch == "%" and i + 2 < len(s):
-            hexpart = s[i+1:i+3]
-            try:
-                out.append(int(hexpart, 16))
-                i += 3
-                continue
-            except ValueError:
-                pass
-        # default: append original char bytes
-        out.extend(s[i].encode("utf-8", "ignore"))
-        i += 1
-    return out.decode("utf-8", "replace")
+    # One compiled-regex pass over the UTF-8 bytes: each %HH token becomes
+    # its raw byte, everything else passes through, then a single decode.
+    raw = _pct_pat.sub(lambda m: bytes([int(m.group(1), 16)]), s.encode("utf-8", "ignore"))
+    return raw.decode("utf-8", "replace")
+
+
+# Hoisted out of sanitize_filename: called once per resource in tight loops
+_BAD_RE = re.compile(r"[\\/:*?\"<>|\r\n\t]+")
+_WS_RE = re.compile(r"\s+")
 
 
 def sanitize_filename(name: str) -> str:
     """Restrict filename to safe characters for most filesystems."""
-    name = re.sub(r"[\\/:*?\"<>|\r\n\t]+", "_", name.strip())
+    name = _BAD_RE.sub("_", name.strip())
     # collapse spaces/underscores
-    name = re.sub(r"\s+", " ", name).strip()
+    name = _WS_RE.sub(" ", name).strip()
     name = name.replace(" ", "_")
     return name or "arquivo"
 
 
 def ensure_suffix(path: pathlib.Path, suffix: str) -> pathlib.Path:
-    return path if str(path).lower().endswith(suffix.lower()) else path.with_name(path.name + suffix)
+    # Compare only the name's tail case-insensitively instead of lowering
+    # (allocating) the whole stringified path on every call.
+    name = path.name
+    if name[-len(suffix):].casefold() == suffix.casefold():
+        return path
+    return path.with_name(name + suffix)
 
 
 # =====================
 # HTTP client factory
 # =====================
 def make_client(timeout_s: float = TIMEOUT_S) -> httpx.Client:
-    # Conservative pool; enable HTTP/2 if available
-    limits = httpx.Limits(max_connections=10, max_keepalive_connections=5)
-    return httpx.Client(timeout=timeout_s, limits=limits, http2=True, follow_redirects=True)
+    # This client only serves JSON API calls (downloads use the async
+    # client); HTTP/2 multiplexes those over one stream, so a tiny pool
+    # avoids opening connections the server would rather we didn't.
+    limits = httpx.Limits(max_connections=2, max_keepalive_connections=2)
+    transport: httpx.BaseTransport = httpx.HTTPTransport(http2=True)
+    if hishel is not None:
+        # Standards-driven caching under the TTL cache: honors Cache-Control
+        # and serves stale-while-revalidate without extra cache logic here.
+        transport = hishel.CacheTransport(
+            transport=transport,
+            storage=hishel.FileStorage(base_path=CACHE_DIR / "http", ttl=3600),
+            controller=hishel.Controller(allow_stale=True, cacheable_methods=["GET"],
+                                         cacheable_status_codes=[200]),
+        )
+    return httpx.Client(timeout=timeout_s, limits=limits, http2=True,
+                        follow_redirects=True, transport=transport)
+
+
+_CLIENT: httpx.Client | None = None
+
+def get_client() -> httpx.Client:
+    """Lazy module-level client: one TLS handshake + keepalive pool for all calls."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = make_client()
+        atexit.register(_CLIENT.close)
+    return _CLIENT
+
+
+def make_async_client(timeout_s: float = TIMEOUT_S, concurrency: int = CONCURRENCY,
+                      for_api: bool = False) -> httpx.AsyncClient:
+    # Pool sized by workload: bulk downloads want ~2x the worker count so
+    # range requests never queue behind each other, while API fan-outs
+    # multiplex fine over a couple of HTTP/2 connections.
+    if for_api:
+        limits = httpx.Limits(max_connections=2, max_keepalive_connections=2)
+    else:
+        limits = httpx.Limits(max_connections=max(concurrency * 2, 4),
+                              max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(timeout=timeout_s, limits=limits, http2=True, follow_redirects=True)
 
 
 # =====================
 # CKAN API helpers
 # =====================
-def ckan_call(base: str, action: str, params: dict) -> dict:
-    url = f"{base}/api/3/action/{action}"
-    with make_client() as client:
-        r = client.get(url, params=params)
-        r.raise_for_status()
-        data = r.json()
+def _cache_path(url: str, params: dict) -> pathlib.Path:
+    key = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+    return CACHE_DIR / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def _cache_store(cache_file: pathlib.Path, envelope: dict) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(_json_dumps(envelope), encoding="utf-8")
+    except OSError:
+        pass  # cache is best-effort; never fail the call over it
+
+
+def _cache_load(cache_file: pathlib.Path) -> dict | None:
+    if CACHE_TTL_S > 0 and cache_file.exists():
+        try:
+            return _json_loads(cache_file.read_bytes())
+        except (OSError, ValueError):
+            pass
+    return None
+
+
+def _conditional_headers(envelope: dict | None) -> dict:
+    headers = {}
+    if envelope:
+        if envelope.get("etag"):
+            headers["If-None-Match"] = envelope["etag"]
+        if envelope.get("last_modified"):
+            headers["If-Modified-Since"] = envelope["last_modified"]
+    return headers
+
+
+def _cache_settle(r: httpx.Response, envelope: dict | None,
+                  cache_file: pathlib.Path, now: float) -> dict:
+    """Turn the response into a body dict, updating the cache (304 → bump TTL)."""
+    if r.status_code == 304 and envelope:
+        envelope["fetched_at"] = now
+        _cache_store(cache_file, envelope)
+        return envelope["body"]
+    r.raise_for_status()
+    data = _json_loads(r.content)
+    if CACHE_TTL_S > 0:
+        _cache_store(cache_file, {
+            "fetched_at": now,
+            "etag": r.headers.get("etag"),
+            "last_modified": r.headers.get("last-modified"),
+            "body": data,
+        })
+    return data
+
+
+def _unwrap(action: str, data: dict) -> dict:
     if not data.get("success"):
         raise RuntimeError(f"CKAN {action} falhou: {data}")
     return data["result"]
 
 
-def ckan_package_show(base: str, dataset_id_or_slug: str) -> dict:
-    return ckan_call(base, "package_show", {"id": dataset_id_or_slug})
+def ckan_call(base: str, action: str, params: dict,
+              client: httpx.Client | None = None) -> dict:
+    url = f"{base}/api/3/action/{action}"
+
+    # Fresh cache hit → zero HTTP; stale hit → conditional GET (ETag/Last-Modified)
+    cache_file = _cache_path(url, params)
+    envelope = _cache_load(cache_file)
+    now = time.time()
+    if envelope and now - envelope.get("fetched_at", 0) < CACHE_TTL_S:
+        return _unwrap(action, envelope["body"])
+    # Default to the shared module client so every call rides one pool
+    r = (client or get_client()).get(url, params=params, headers=_conditional_headers(envelope))
+    return _unwrap(action, _cache_settle(r, envelope, cache_file, now))
+
+
+async def ckan_call_async(client: httpx.AsyncClient, base: str, action: str, params: dict) -> dict:
+    """Async twin of ckan_call sharing the same on-disk cache and a caller-owned client."""
+    url = f"{base}/api/3/action/{action}"
+    cache_file = _cache_path(url, params)
+    envelope = _cache_load(cache_file)
+    now = time.time()
+    if envelope and now - envelope.get("fetched_at", 0) < CACHE_TTL_S:
+        return _unwrap(action, envelope["body"])
+    r = await client.get(url, params=params, headers=_conditional_headers(envelope))
+    return _unwrap(action, _cache_settle(r, envelope, cache_file, now))
+
+
+def ckan_package_show(base: str, dataset_id_or_slug: str,
+                      client: httpx.Client | None = None) -> dict:
+    return ckan_call(base, "package_show", {"id": dataset_id_or_slug}, client=client)
 
 
-def ckan_group_show(base: str, group_id_or_name: str, include_datasets: bool = True) -> dict:
-    return ckan_call(base, "group_show", {"id": group_id_or_name, "include_datasets": include_datasets})
+def ckan_group_show(base: str, group_id_or_name: str, include_datasets: bool = True,
+                    client: httpx.Client | None = None) -> dict:
+    return ckan_call(base, "group_show", {"id": group_id_or_name, "include_datasets": include_datasets},
+                     client=client)
 
 
 # =====================
 # Resource filters
 # =====================
 def is_xlsx_resource(res: dict) -> bool:
-    fmt = (res.get("format") or "").strip().lower()
-    url = (res.get("url") or res.get("download_url") or "").strip().lower()
-    return fmt == "xlsx" or url.endswith(".xlsx")
+    # Hot predicate (O(packages × resources) in group listings): check the
+    # cheap format field first and only touch/lower the URL when needed.
+    fmt = res.get("format")
+    if fmt and fmt.strip().lower() == "xlsx":
+        return True
+    url = res.get("url") or res.get("download_url")
+    return bool(url) and url.strip().lower().endswith(".xlsx")
 
 
 def res_pretty_name(res: dict) -> str:
@@ -207,48 +364,276 @@ def guess_filename(resp: httpx.Response, fallback_url: str, name_hint: str | Non
 # =====================
 # Download helpers
 # =====================
-def download_stream(url: str, dest_dir: pathlib.Path, name_hint: str | None = None,
-                    timeout_s: float = TIMEOUT_S) -> pathlib.Path:
-    """Stream a file to disk with progress. Retries are handled by caller."""
+def _meta_path(out_path: pathlib.Path) -> pathlib.Path:
+    return out_path.with_name(out_path.name + ".meta.json")
+
+
+def _write_meta(out_path: pathlib.Path, headers: httpx.Headers, size: int) -> None:
+    """Record validators next to the file so re-runs can skip the GET entirely."""
+    try:
+        _meta_path(out_path).write_text(_json_dumps({
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "size": size,
+        }), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _already_downloaded(out_path: pathlib.Path, head: httpx.Response) -> bool:
+    """True when the local file matches the server's Content-Length (and ETag, if both sides have one)."""
+    if not out_path.exists():
+        return False
+    try:
+        size = int(head.headers.get("content-length") or -1)
+    except ValueError:
+        return False
+    if size < 0 or out_path.stat().st_size != size:
+        return False
+    etag = head.headers.get("etag")
+    if etag:
+        try:
+            meta = _json_loads(_meta_path(out_path).read_bytes())
+        except (OSError, ValueError):
+            meta = None
+        if meta and meta.get("etag") and meta["etag"] != etag:
+            return False
+    return True
+
+
+async def download_ranged(client: httpx.AsyncClient, url: str, out_path: pathlib.Path,
+                          total: int, parts: int = MULTIPART_PARTS) -> pathlib.Path:
+    """Pull `total` bytes in `parts` parallel byte-ranges into pre-allocated offsets.
+
+    Per-part completion is checkpointed in a sidecar JSON next to the .part
+    file so an interrupted download resumes only the missing ranges.
+    Raises RuntimeError if the server ignores Range (caller falls back to
+    the single-stream path).
+    """
+    tmp_path = out_path.with_suffix(out_path.suffix + ".part")
+    ckpt_path = tmp_path.with_suffix(tmp_path.suffix + ".json")
+    done: set[int] = set()
+    if ckpt_path.exists() and tmp_path.exists():
+        try:
+            ckpt = _json_loads(ckpt_path.read_bytes())
+            if ckpt.get("total") == total and ckpt.get("parts") == parts:
+                done = set(ckpt.get("done", []))
+        except Exception:
+            done = set()
+
+    t0 = time.time()
+    fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, total)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, total)
+        part_size = math.ceil(total / parts)
+        ckpt_lock = asyncio.Lock()
+
+        async def fetch_part(k: int) -> None:
+            if k in done:
+                return
+            a = k * part_size
+            b = min(total, a + part_size) - 1
+            offset = a
+            async with client.stream("GET", url, headers={"Range": f"bytes={a}-{b}"}) as r:
+                if r.status_code != 206:
+                    raise RuntimeError(f"servidor ignorou Range (status {r.status_code})")
+                async for chunk in r.aiter_bytes(chunk_size=CHUNK_SIZE):
+                    # Off-loop write: a slow disk must not stall the other ranges
+                    await asyncio.to_thread(os.pwrite, fd, chunk, offset)
+                    offset += len(chunk)
+            if offset != b + 1:
+                raise RuntimeError(f"parte {k}: esperados {b + 1 - a} bytes, recebidos {offset - a}")
+            async with ckpt_lock:
+                done.add(k)
+                ckpt_path.write_text(
+                    _json_dumps({"total": total, "parts": parts, "done": sorted(done)}),
+                    encoding="utf-8",
+                )
+
+        try:
+            # TaskGroup cancels and awaits the sibling parts on first
+            # failure, so no orphaned task can pwrite into the fd after
+            # the close below (the number could be reused by a new file).
+            async with asyncio.TaskGroup() as tg:
+                for k in range(parts):
+                    tg.create_task(fetch_part(k))
+        except ExceptionGroup as eg:
+            # Surface one exception so the fallback/retry logic upstream
+            # sees the usual RuntimeError / httpx error types.
+            raise eg.exceptions[0] from None
+    finally:
+        os.close(fd)
+    ckpt_path.unlink(missing_ok=True)
+    tmp_path.replace(out_path)
+    dt = max(1e-6, time.time() - t0)
+    rate = total / dt / (1024 * 1024)
+    print(f"✓ Salvo: {out_path}  ({total/1_048_576:.2f} MiB em {dt:.1f}s, {rate:.2f} MiB/s, {parts} ranges)")
+    return out_path
+
+
+async def download_stream(client: httpx.AsyncClient, url: str, dest_dir: pathlib.Path,
+                          name_hint: str | None = None,
+                          show_progress: bool = True) -> pathlib.Path:
+    """Stream a file to disk with progress. Retries are handled by caller.
+
+    Uses the shared AsyncClient so concurrent downloads reuse one pool
+    (interleaved progress lines are suppressed via show_progress=False).
+    Large files on range-capable servers are split into parallel byte
+    ranges (see download_ranged); otherwise falls back to a single GET.
+    """
     dest_dir.mkdir(parents=True, exist_ok=True)
-    with httpx.stream("GET", url, timeout=timeout_s, follow_redirects=True) as r:
-        r.raise_for_status()
-        filename = guess_filename(r, url, name_hint)
-        out_path = dest_dir / filename
+
+    # Probe size + range support; big files go through the multi-part path.
+    # A successful HEAD also fixes the filename early, enabling resume below.
+    out_path: pathlib.Path | None = None
+    total_hint = 0
+    head: httpx.Response | None = None
+    try:
+        head = await client.head(url)
+    except httpx.HTTPError:
+        pass  # HEAD not supported — single stream below
+    if head is not None and head.status_code < 400:
+        total_hint = int(head.headers.get("content-length") or 0)
+        ranges_ok = head.headers.get("accept-ranges", "").strip().lower() == "bytes"
+        out_path = dest_dir / guess_filename(head, url, name_hint)
+        if _already_downloaded(out_path, head):
+            print(f"✓ Já baixado (cache): {out_path}")
+            return out_path
+        if ranges_ok and total_hint > MULTIPART_THRESHOLD:
+            try:
+                # httpx errors propagate to download_with_retry so a dropped
+                # range gets backoff + checkpoint resume, not a silent
+                # full re-download here.
+                result = await download_ranged(client, url, out_path, total_hint)
+                _write_meta(out_path, head.headers, total_hint)
+                return result
+            except RuntimeError as e:
+                print(f"\nRange falhou ({e}); usando stream único.")
+
+    # Resume a leftover .part by asking only for the missing tail
+    headers: dict[str, str] = {}
+    existing = 0
+    tmp_path: pathlib.Path | None = None
+    if out_path is not None:
         tmp_path = out_path.with_suffix(out_path.suffix + ".part")
-        total = int(r.headers.get("content-length") or 0)
-        downloaded = 0
+        if tmp_path.exists():
+            existing = tmp_path.stat().st_size
+            if total_hint and existing >= total_hint:
+                # .part already full-size (killed between close and rename,
+                # or preallocated by an aborted ranged attempt): asking for
+                # bytes=<total>- would only earn a 416. Restart clean.
+                existing = 0
+            if existing:
+                headers["Range"] = f"bytes={existing}-"
+
+    async with client.stream("GET", url, headers=headers) as r:
+        if r.status_code == 416 and existing:
+            # Server refuses to extend the .part (stale or complete);
+            # discard it and retry once from byte 0 with no Range.
+            print(f"Range inválido para {tmp_path.name}; reiniciando do zero.")
+            tmp_path.unlink(missing_ok=True)
+            return await download_stream(client, url, dest_dir, name_hint=name_hint,
+                                         show_progress=show_progress)
+        r.raise_for_status()
+        if out_path is None:
+            out_path = dest_dir / guess_filename(r, url, name_hint)
+            tmp_path = out_path.with_suffix(out_path.suffix + ".part")
+        assert tmp_path is not None
+        filename = out_path.name
+
+        resumed = r.status_code == 206 and existing > 0
+        if resumed:
+            # Content-Range: bytes a-b/total
+            tail = r.headers.get("content-range", "").rpartition("/")[2]
+            total = int(tail) if tail.isdigit() else existing + int(r.headers.get("content-length") or 0)
+            print(f"Retomando {filename} a partir de {existing/1_048_576:.2f} MiB")
+        else:
+            total = int(r.headers.get("content-length") or 0)
+
         t0 = time.time()
-        with open(tmp_path, "wb") as f:
-            for chunk in r.iter_bytes(chunk_size=1024 * 1024):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total:
-                    pct = (downloaded / total) * 100
-                    # Simple progress line (overwritable)
-                    sys.stdout.write(f"\rBaixando {filename}: {pct:6.2f}%")
-                    sys.stdout.flush()
+        # Raw fd + os.write skips buffered-IO copying; one syscall per chunk
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if resumed else os.O_TRUNC)
+        fd = os.open(tmp_path, flags, 0o644)
+
+        # Progress is sampled from the fd size by a side task, so the copy
+        # loop below carries no per-chunk accounting or stdout at all.
+        async def progress_loop() -> None:
+            while True:
+                await asyncio.sleep(PROGRESS_INTERVAL_S)
+                pct = (os.fstat(fd).st_size / total) * 100
+                # Simple progress line (overwritable)
+                sys.stdout.write(f"\rBaixando {filename}: {pct:6.2f}%")
+                sys.stdout.flush()
+
+        reporter = asyncio.create_task(progress_loop()) if total and show_progress else None
+        try:
+            async for chunk in r.aiter_bytes(chunk_size=CHUNK_SIZE):
+                # Off-loop write so concurrent downloads keep pumping chunks
+                await asyncio.to_thread(os.write, fd, chunk)
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+                try:
+                    await reporter
+                except asyncio.CancelledError:
+                    pass
+            os.close(fd)
+        final_size = tmp_path.stat().st_size
+        if total and final_size != total:
+            raise RuntimeError(f"{filename}: tamanho final {final_size} != esperado {total}")
         tmp_path.replace(out_path)
-        if total:
+        # A fallback from the ranged path may have left its checkpoint behind
+        tmp_path.with_suffix(tmp_path.suffix + ".json").unlink(missing_ok=True)
+        _write_meta(out_path, r.headers, final_size)
+        if total and show_progress:
             sys.stdout.write("\n")
         dt = max(1e-6, time.time() - t0)
-        rate = downloaded / dt / (1024 * 1024)
-        print(f"✓ Salvo: {out_path}  ({downloaded/1_048_576:.2f} MiB em {dt:.1f}s, {rate:.2f} MiB/s)")
+        fetched = final_size - existing
+        rate = fetched / dt / (1024 * 1024)
+        print(f"✓ Salvo: {out_path}  ({fetched/1_048_576:.2f} MiB em {dt:.1f}s, {rate:.2f} MiB/s)")
         return out_path
 
 
-def download_with_retry(url: str, dest_dir: pathlib.Path, name_hint: str | None = None,
-                        retry: int = RETRY, sleep_between: float = SLEEP_BETWEEN,
-                        timeout_s: float = TIMEOUT_S) -> pathlib.Path:
+# Transient statuses worth retrying; other 4xx won't get better on retry
+_RETRY_STATUS = frozenset({429, 502, 503, 504})
+BACKOFF_CAP_S = 30.0
+
+
+async def download_with_retry(client: httpx.AsyncClient, url: str, dest_dir: pathlib.Path,
+                              name_hint: str | None = None,
+                              retry: int = RETRY, sleep_between: float = SLEEP_BETWEEN,
+                              show_progress: bool = True) -> pathlib.Path:
+    """Retry transient failures with exponential backoff + full jitter.
+
+    Jitter keeps concurrent workers from retrying in lockstep against a
+    struggling server; `sleep_between` is the backoff base. Retry-After
+    is honored when the server sends one.
+    """
     last_err: Exception | None = None
     for attempt in range(1, retry + 1):
+        retry_after: float | None = None
         try:
-            return download_stream(url, dest_dir, name_hint=name_hint, timeout_s=timeout_s)
-        except Exception as e:
+            return await download_stream(client, url, dest_dir, name_hint=name_hint,
+                                         show_progress=show_progress)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in _RETRY_STATUS:
+                raise
+            last_err = e
+            try:
+                retry_after = float(e.response.headers.get("retry-after", ""))
+            except ValueError:
+                pass
+        except httpx.TransportError as e:  # ConnectError, ReadTimeout, ...
             last_err = e
-            print(f"\n[tentativa {attempt}/{retry}] Erro ao baixar {url}: {e}")
-            if attempt < retry:
-                time.sleep(sleep_between)
+        print(f"\n[tentativa {attempt}/{retry}] Erro ao baixar {url}: {last_err}")
+        if attempt < retry:
+            delay = random.uniform(0, min(BACKOFF_CAP_S, sleep_between * 2 ** (attempt - 1)))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            await asyncio.sleep(delay)
     assert last_err is not None
     raise last_err
 
@@ -291,21 +676,43 @@ def action_download_dataset_xlsx(args: argparse.Namespace) -> int:
         return 0
 
     out_dir.mkdir(parents=True, exist_ok=True)
-    print(f"Foram encontrados {len(xlsx)} resources XLSX. Pasta de saída: {out_dir}")
-
-    for i, r in enumerate(xlsx, 1):
-        url = res_url(r)
-        name = res_pretty_name(r) or f"arquivo_{i}.xlsx"
-        if not url:
-            print(f"[{i}] Resource sem URL, pulando: {r.get('id')}")
-            continue
-
-        print(f"\n[{i}/{len(xlsx)}] {name}")
-        print(f"URL: {url}")
-        try:
-            download_with_retry(url, out_dir, name_hint=name, retry=args.retry, sleep_between=args.sleep)
-        except Exception as e:
-            print(f"Falhou: {e}")
+    concurrency = max(1, args.concurrency)
+    print(f"Foram encontrados {len(xlsx)} resources XLSX. Pasta de saída: {out_dir}"
+          f" (concorrência: {concurrency})")
+
+    # Overlapping N streams: one shared AsyncClient + bounded semaphore.
+    # Progress bars only make sense serial, interactive and not --quiet.
+    show_progress = concurrency == 1 and not args.quiet and sys.stdout.isatty()
+
+    async def run_downloads() -> int:
+        sem = asyncio.Semaphore(concurrency)
+        failures = 0
+
+        async def one(i: int, res: dict) -> None:
+            nonlocal failures
+            url = res_url(res)
+            name = res_pretty_name(res) or f"arquivo_{i}.xlsx"
+            if not url:
+                print(f"[{i}] Resource sem URL, pulando: {res.get('id')}")
+                return
+            async with sem:
+                print(f"[{i}/{len(xlsx)}] {name}\nURL: {url}")
+                try:
+                    await download_with_retry(client, url, out_dir, name_hint=name,
+                                              retry=args.retry, sleep_between=args.sleep,
+                                              show_progress=show_progress)
+                except Exception as e:
+                    failures += 1
+                    print(f"[{i}/{len(xlsx)}] Falhou: {e}")
+
+        async with make_async_client(timeout_s=TIMEOUT_S, concurrency=concurrency) as client:
+            await asyncio.gather(*(one(i, res) for i, res in enumerate(xlsx, 1)))
+        return failures
+
+    failures = asyncio.run(run_downloads())
+    if failures:
+        print(f"\nConcluído com {failures} falha(s).")
+        return 1
     print("\nConcluído.")
     return 0
 
@@ -316,63 +723,109 @@ def action_list_group(args: argparse.Namespace) -> int:
     fmt_filter = (args.format or "").strip().lower()
     csv_out: str | None = args.csv
 
-    res = ckan_group_show(base, group, include_datasets=True)
-    packages = res.get("packages") or res.get("datasets") or []
+    # Bulk path first: package_search already embeds each package's
+    # resources, so one call per 1000 datasets replaces N package_show
+    # round-trips (and CKAN servers cache package_search aggressively).
+    packages: list[dict] = []
+    shows: list[dict | Exception] = []
+    try:
+        start = 0
+        while True:
+            res = ckan_call(base, "package_search",
+                            {"q": f"groups:{group}", "rows": 1000,
+                             "start": start, "include_private": "false"})
+            batch = res.get("results") or []
+            packages.extend(batch)
+            # Advance by what actually came back: ckan.search.rows_max may
+            # cap pages below the requested 1000.
+            start += len(batch)
+            if not batch or start >= int(res.get("count") or 0):
+                break
+        shows = list(packages)
+    except (httpx.HTTPError, RuntimeError) as e:
+        print(f"package_search indisponível ({e}); usando group_show + package_show.")
+        packages = []
 
     if not packages:
-        print("Nenhum dataset encontrado no group.")
-        return 0
-
-    rows: list[dict] = []
-    for i, pkg in enumerate(packages, start=1):
-        ds_title = pkg.get("title") or pkg.get("name") or pkg.get("id")
-        ds_name  = pkg.get("name") or pkg.get("id")
-        ds_id    = pkg.get("id")
-        print(f"\n[{i}/{len(packages)}] Dataset: {ds_title} ({ds_name})")
+        # Fallback: group listing + latency-bound fan-out pipelining all
+        # package_show calls over one HTTP/2 client, bounded to not hammer
+        # the CKAN server. Results come back in package order (gather
+        # preserves input ordering).
+        res = ckan_group_show(base, group, include_datasets=True)
+        packages = res.get("packages") or res.get("datasets") or []
+
+        if not packages:
+            print("Nenhum dataset encontrado no group.")
+            return 0
+
+        async def fetch_all() -> list[dict | Exception]:
+            sem = asyncio.Semaphore(10)
+
+            async def one(pkg: dict) -> dict | Exception:
+                async with sem:
+                    try:
+                        return await ckan_call_async(
+                            client, base, "package_show",
+                            {"id": pkg.get("id") or pkg.get("name")})
+                    except Exception as e:
+                        return e
+
+            async with make_async_client(timeout_s=TIMEOUT_S, for_api=True) as client:
+                return await asyncio.gather(*(one(p) for p in packages))
+
+        shows = asyncio.run(fetch_all())
+
+    # Stream rows straight to the CSV as they are seen — no rows list,
+    # O(1) memory for arbitrarily large groups. The file is only opened
+    # on the first matching row so an empty result leaves the path alone.
+    fieldnames = [
+        "dataset_title", "dataset_name", "dataset_id",
+        "resource_name", "resource_format", "resource_url", "resource_id"
+    ]
+    csv_file = None
+    csv_writer = None
 
-        try:
-            ds = ckan_package_show(base, ds_id or ds_name)
+    try:
+        for i, (pkg, ds) in enumerate(zip(packages, shows), start=1):
+            ds_title = pkg.get("title") or pkg.get("name") or pkg.get("id")
+            ds_name  = pkg.get("name") or pkg.get("id")
+            ds_id    = pkg.get("id")
+            print(f"\n[{i}/{len(packages)}] Dataset: {ds_title} ({ds_name})")
+
+            if isinstance(ds, Exception):
+                print(f"  ! Falha ao obter resources: {ds}")
+                continue
             resources = ds.get("resources", [])
-        except Exception as e:
-            print(f"  ! Falha ao obter resources: {e}")
-            continue
-
-        if not resources:
-            print("  (sem resources)")
-            continue
-
-        for r in resources:
-            fmt = (r.get("format") or "").strip()
-            url = res_url(r)
-            rname = res_pretty_name(r)
-            # Optional format filter
-            if fmt_filter and fmt.lower() != fmt_filter and not url.lower().endswith(f".{fmt_filter}"):
+
+            if not resources:
+                print("  (sem resources)")
                 continue
 
-            print(f"  - {rname}  |  format={fmt}  |  url={url}")
-            rows.append({
-                "dataset_title": ds_title,
-                "dataset_name": ds_name,
-                "dataset_id": ds_id,
-                "resource_name": rname,
-                "resource_format": fmt,
-                "resource_url": url,
-                "resource_id": r.get("id"),
-            })
-
-    if csv_out and rows:
-        # Write a simple CSV without pandas dependency
-        fieldnames = [
-            "dataset_title", "dataset_name", "dataset_id",
-            "resource_name", "resource_format", "resource_url", "resource_id"
-        ]
-        with open(csv_out, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            for row in rows:
-                w.writerow(row)
+            for r in resources:
+                fmt = (r.get("format") or "").strip()
+                url = res_url(r)
+                rname = res_pretty_name(r)
+                # Optional format filter
+                if fmt_filter and fmt.lower() != fmt_filter and not url.lower().endswith(f".{fmt_filter}"):
+                    continue
+
+                print(f"  - {rname}  |  format={fmt}  |  url={url}")
+                if csv_out:
+                    if csv_writer is None:
+                        csv_file = open(csv_out, "w", newline="", encoding="utf-8")
+                        csv_writer = csv.writer(csv_file)
+                        csv_writer.writerow(fieldnames)
+                    # Plain writer + fixed column order; no per-row dict mapping
+                    csv_writer.writerow((ds_title, ds_name, ds_id, rname, fmt, url, r.get("id")))
+
+    finally:
+        # Close on every exit path (errors, Ctrl-C), not just success
+        if csv_file is not None:
+            csv_file.close()
+
+    if csv_file is not None:
         print(f"\n✓ Exportado CSV: {csv_out}")
-    elif csv_out and not rows:
+    elif csv_out:
         print("\nNada para exportar; verifique o filtro --format.")
     return 0
 
@@ -387,6 +840,8 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p.add_argument("--base", default=DEFAULT_BASE, help=f"CKAN base URL (default: {DEFAULT_BASE})")
     p.add_argument("--timeout", type=float, default=TIMEOUT_S, help=f"Timeout em segundos (default: {TIMEOUT_S})")
+    p.add_argument("--cache-ttl", type=float, default=CACHE_TTL_S,
+                   help=f"TTL do cache de respostas CKAN em segundos; 0 desativa (default: {CACHE_TTL_S})")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     # list-dataset-xlsx
@@ -400,6 +855,9 @@ def build_parser() -> argparse.ArgumentParser:
     sp2.add_argument("--out", default="downloads", help="Diretório de saída (default: ./downloads)")
     sp2.add_argument("--retry", type=int, default=RETRY, help=f"Número de tentativas (default: {RETRY})")
     sp2.add_argument("--sleep", type=float, default=SLEEP_BETWEEN, help=f"Intervalo entre tentativas (default: {SLEEP_BETWEEN}s)")
+    sp2.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                     help=f"Downloads simultâneos (default: {CONCURRENCY})")
+    sp2.add_argument("--quiet", action="store_true", help="Suprimir a barra de progresso")
     sp2.set_defaults(func=action_download_dataset_xlsx)
 
     # list-group
@@ -416,9 +874,10 @@ def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
 
-    # Apply timeout globally by monkey-patching TIMEOUT_S used by helpers
-    global TIMEOUT_S
+    # Apply timeout/cache TTL globally by monkey-patching the module settings
+    global TIMEOUT_S, CACHE_TTL_S
     TIMEOUT_S = float(args.timeout)
+    CACHE_TTL_S = float(args.cache_ttl)
 
     try:
         return args.func(args)